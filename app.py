@@ -1,10 +1,18 @@
 import asyncio
+import contextlib
 import logging
 import os
-import threading
-from flask import Flask, request, Response
+import sys
+
+import orjson
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
 from telegram import Update
 from telegram.ext import Application
+from telegram.request import HTTPXRequest
 
 from config import BOT_TOKEN, WEBHOOK_URL
 from database import init_db
@@ -13,9 +21,13 @@ from handlers.admin import (
     admin_conversation,
     admin_delete_user_callback_handler,
     admin_delete_video_callback_handler,
+    admin_noop_callback_handler,
+    admin_users_page_callback_handler,
+    admin_videos_page_callback_handler,
     addadmin_handler,
+    reload_admins,
 )
-from handlers.user import registration_handler
+from handlers.user import registration_handler, reload_known_users, warmup_caches
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -23,13 +35,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-PORT = int(os.getenv("PORT", "8080"))
 
-application = Flask(__name__)
+def _skip_probe_logs(record: logging.LogRecord) -> bool:
+    message = record.getMessage()
+    return "/health" not in message and '"GET / ' not in message
+
+
+# Health probes hit every few seconds; keep them out of the access log.
+logging.getLogger("uvicorn.access").addFilter(_skip_probe_logs)
+
+PORT = int(os.getenv("PORT", "8080"))
 
 telegram_app: Application | None = None
-event_loop: asyncio.AbstractEventLoop | None = None
-loop_thread: threading.Thread | None = None
+
+# Bound once at startup so the webhook hot path skips the Application
+# attribute/property lookups per request.
+_bot = None
+_process_update = None
+
+# Strong references to in-flight update tasks — the loop itself only holds
+# weak ones, so an unreferenced task could be GC'd mid-flight.
+_UPDATE_TASKS: set[asyncio.Task] = set()
 
 
 async def on_error(update, context):
@@ -39,14 +65,27 @@ async def on_error(update, context):
 def setup_application() -> Application:
     logger.info("Setting up Telegram application...")
     init_db()
-
-    app = Application.builder().token(BOT_TOKEN).build()
+    reload_admins()
+    reload_known_users()
+
+    # A large keep-alive pool lets the chunked broadcast reuse TLS
+    # connections instead of re-handshaking per message.
+    request = HTTPXRequest(
+        connection_pool_size=64,
+        pool_timeout=5.0,
+        connect_timeout=5.0,
+        read_timeout=20.0,
+    )
+    app = Application.builder().token(BOT_TOKEN).request(request).build()
 
     # Admin (isolated conversation)
     app.add_handler(addadmin_handler, group=0)
     app.add_handler(admin_conversation, group=0)
     app.add_handler(admin_delete_user_callback_handler, group=0)
     app.add_handler(admin_delete_video_callback_handler, group=0)
+    app.add_handler(admin_users_page_callback_handler, group=0)
+    app.add_handler(admin_videos_page_callback_handler, group=0)
+    app.add_handler(admin_noop_callback_handler, group=0)
 
     # User conversation
     app.add_handler(registration_handler, group=1)
@@ -56,42 +95,37 @@ def setup_application() -> Application:
     return app
 
 
-@application.route("/webhook", methods=["POST"])
-def webhook():
-    global telegram_app, event_loop
-    if telegram_app is None or event_loop is None:
-        return Response(status=503)
+async def webhook(request: Request) -> Response:
+    if _process_update is None:
+        return Response(status_code=503)
 
+    # Parse, schedule, ack. process_update runs as a task on this same
+    # event loop; handler errors are reported through PTB's on_error.
     try:
-        update_data = request.get_json(force=True)
-        update = Update.de_json(update_data, telegram_app.bot)
-
-        future = asyncio.run_coroutine_threadsafe(
-            telegram_app.process_update(update), event_loop
-        )
+        update_data = orjson.loads(await request.body())
+    except Exception as e:
+        logger.error(f"Webhook parse error: {e}")
+        return Response(status_code=500)
 
-        def _log_future(f):
-            try:
-                f.result()
-            except Exception as e:
-                logger.exception(f"process_update crashed: {e}")
+    update = Update.de_json(update_data, _bot)
+    task = asyncio.create_task(_process_update(update))
+    _UPDATE_TASKS.add(task)
+    task.add_done_callback(_UPDATE_TASKS.discard)
+    return Response(status_code=200)
 
-        future.add_done_callback(_log_future)
 
-        return Response(status=200)
-    except Exception as e:
-        logger.error(f"Webhook parse error: {e}")
-        return Response(status=500)
+# Static responses for the probe endpoints — no per-request construction
+# or JSON serialization.
+_INDEX_RESPONSE = PlainTextResponse("Telegram Bot is running!")
+_HEALTH_RESPONSE = Response(b'{"status":"ok","bot":"running"}', media_type="application/json")
 
 
-@application.route("/")
-def index():
-    return "Telegram Bot is running!"
+async def index(request: Request) -> Response:
+    return _INDEX_RESPONSE
 
 
-@application.route("/health")
-def health():
-    return {"status": "ok", "bot": "running"}
+async def health(request: Request) -> Response:
+    return _HEALTH_RESPONSE
 
 
 async def setup_webhook():
@@ -103,34 +137,55 @@ async def setup_webhook():
 
     logger.info(f"Resetting webhook to: {WEBHOOK_URL}")
     await telegram_app.bot.delete_webhook(drop_pending_updates=True)
-    await telegram_app.bot.set_webhook(url=WEBHOOK_URL)
+    # Only messages and callback queries are handled; skipping the other
+    # update categories saves inbound traffic and per-update parsing.
+    await telegram_app.bot.set_webhook(
+        url=WEBHOOK_URL,
+        allowed_updates=["message", "callback_query"],
+        max_connections=40,
+    )
 
     info = await telegram_app.bot.get_webhook_info()
     logger.info(f"Webhook set to: {info.url}")
 
 
-def _start_event_loop(loop: asyncio.AbstractEventLoop):
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
-
-
-def main():
-    global telegram_app, event_loop, loop_thread
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    global telegram_app, _bot, _process_update
 
     logger.info("Starting Telegram bot in webhook mode...")
     telegram_app = setup_application()
 
-    event_loop = asyncio.new_event_loop()
-    loop_thread = threading.Thread(target=_start_event_loop, args=(event_loop,), daemon=True)
-    loop_thread.start()
+    await telegram_app.initialize()
+    await telegram_app.start()
+    await warmup_caches()
+    await setup_webhook()
+    _bot = telegram_app.bot
+    _process_update = telegram_app.process_update
+    try:
+        yield
+    finally:
+        await telegram_app.stop()
+        await telegram_app.shutdown()
+
+
+application = Starlette(
+    routes=[
+        Route("/webhook", webhook, methods=["POST"]),
+        Route("/", index),
+        Route("/health", health),
+    ],
+    lifespan=lifespan,
+)
 
-    asyncio.run_coroutine_threadsafe(telegram_app.initialize(), event_loop).result()
-    asyncio.run_coroutine_threadsafe(telegram_app.start(), event_loop).result()
-    asyncio.run_coroutine_threadsafe(setup_webhook(), event_loop).result()
 
-    logger.info(f"Starting Flask server on port {PORT}...")
-    application.run(host="0.0.0.0", port=PORT, debug=False)
+def main():
+    # uvloop is a libuv-backed event loop, noticeably faster than the
+    # stock selector loop for HTTP-client-heavy workloads like ours.
+    loop_impl = "uvloop" if sys.platform != "win32" else "auto"
+    logger.info(f"Starting uvicorn server on port {PORT}...")
+    uvicorn.run(application, host="0.0.0.0", port=PORT, loop=loop_impl)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
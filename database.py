@@ -1,16 +1,42 @@
+import asyncio
+import concurrent.futures
 import os
-import mysql.connector
+import threading
+
+from mysql.connector import pooling
+
+# Dedicated executor for DB work. Unlike asyncio.to_thread this skips the
+# per-call contextvars copy and partial wrapping, and the bounded worker
+# count caps concurrent queries under burst load.
+_DB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="db")
+
+
+async def run_db(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, fn, *args)
+
+# Shared connection pool: opening a fresh MySQL connection per query costs
+# a TCP+auth handshake every time. Pooled connections are returned to the
+# pool on close(), so the per-call helpers below work unchanged.
+_POOL: pooling.MySQLConnectionPool | None = None
+_POOL_LOCK = threading.Lock()
 
 
 def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST", ""),
-        port=int(os.getenv("DB_PORT", "3306")),
-        database=os.getenv("DB_NAME", ""),
-        user=os.getenv("DB_USER", ""),
-        password=os.getenv("DB_PASSWORD", ""),
-        connection_timeout=10,
-    )
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = pooling.MySQLConnectionPool(
+                    pool_name="sat_bot",
+                    pool_size=10,
+                    host=os.getenv("DB_HOST", ""),
+                    port=int(os.getenv("DB_PORT", "3306")),
+                    database=os.getenv("DB_NAME", ""),
+                    user=os.getenv("DB_USER", ""),
+                    password=os.getenv("DB_PASSWORD", ""),
+                    connection_timeout=10,
+                )
+    return _POOL.get_connection()
 
 
 def get_user_by_telegram_id(telegram_id: int):
@@ -113,6 +139,24 @@ def get_video_by_title(title: str):
             conn.close()
 
 
+def get_all_user_ids():
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT telegram_id FROM users")
+        return [row[0] for row in cur.fetchall()]
+    except Exception as exc:
+        print(f"Database error while fetching user ids: {exc}")
+        return []
+    finally:
+        if cur is not None:
+            cur.close()
+        if conn is not None:
+            conn.close()
+
+
 def get_all_users():
     conn = None
     cur = None
@@ -131,6 +175,29 @@ def get_all_users():
             conn.close()
 
 
+def iter_user_batches(batch_size: int = 500):
+    """Yield user rows in batches so callers can start work on the first
+    batch while the rest of the table is still being read."""
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT id, name, phone, telegram_id FROM users ORDER BY id")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    except Exception as exc:
+        print(f"Database error while streaming users: {exc}")
+    finally:
+        if cur is not None:
+            cur.close()
+        if conn is not None:
+            conn.close()
+
+
 def delete_user_by_telegram_id(telegram_id: int) -> None:
     conn = None
     cur = None
@@ -269,6 +336,24 @@ def is_admin(telegram_id: int) -> bool:
             conn.close()
 
 
+def get_all_admin_ids():
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT telegram_id FROM admins")
+        return [row[0] for row in cur.fetchall()]
+    except Exception as exc:
+        print(f"Database error while fetching admin ids: {exc}")
+        return []
+    finally:
+        if cur is not None:
+            cur.close()
+        if conn is not None:
+            conn.close()
+
+
 def get_all_admins():
     conn = None
     cur = None
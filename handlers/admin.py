@@ -18,14 +18,17 @@ from telegram.ext import (
 )
 
 from config import ADMIN_ID
+from handlers.user import forget_known_user, invalidate_video_cache
 from database import (
     add_admin,
     create_video,
     delete_user_by_telegram_id,
     delete_video_by_id,
+    get_all_admin_ids,
     get_all_users,
     get_all_videos_with_id,
-    is_admin,
+    iter_user_batches,
+    run_db,
 )
 
 logger = logging.getLogger(__name__)
@@ -33,11 +36,39 @@ logger = logging.getLogger(__name__)
 # Admin states
 ADMIN_MENU, ADD_TITLE, ADD_LINK = range(3)
 
+# Broadcast fanout: send this many messages concurrently, then pause one
+# second so the overall rate stays under Telegram's ~30 msg/s global limit.
+BROADCAST_CHUNK_SIZE = 25
+
+# callback_data prefixes; the CallbackQueryHandler patterns below already
+# validate the full format, so handlers slice at these fixed lengths.
+_DELETE_USER_PREFIX_LEN = len("delete_user_")
+_DELETE_VIDEO_PREFIX_LEN = len("delete_video_")
+_USERS_PAGE_PREFIX_LEN = len("users_page_")
+_VIDEOS_PAGE_PREFIX_LEN = len("videos_page_")
+
+# Markups are immutable from our side — build them once instead of per send.
+_ADMIN_MENU_KB = ReplyKeyboardMarkup(
+    [["Add Video", "View Users"], ["Manage Videos"]],
+    resize_keyboard=True,
+    one_time_keyboard=True,
+)
+_REMOVE_KB = ReplyKeyboardRemove()
+
+
+# The admins table is tiny and rarely changes, so keep the full id set in
+# memory. Loaded once at startup via reload_admins(); /addadmin updates it
+# in place, making every admin check a plain set lookup.
+_ADMIN_IDS: set[int] = set()
+
+
+def reload_admins() -> None:
+    _ADMIN_IDS.clear()
+    _ADMIN_IDS.update(get_all_admin_ids())
+
 
-async def _is_admin(telegram_id: int) -> bool:
-    if telegram_id == ADMIN_ID:
-        return True
-    return await asyncio.to_thread(is_admin, telegram_id)
+def _is_admin(telegram_id: int) -> bool:
+    return telegram_id == ADMIN_ID or telegram_id in _ADMIN_IDS
 
 
 # ---- Admin entry ----
@@ -45,19 +76,14 @@ async def admin_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     if update.effective_user is None or update.message is None:
         return ConversationHandler.END
 
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.message.reply_text("Access denied.")
         return ConversationHandler.END
 
     # ✅ This prevents the USER menu handler from reacting after /admin
     context.user_data.clear()
 
-    reply_markup = ReplyKeyboardMarkup(
-        [["Add Video", "View Users"], ["Manage Videos"]],
-        resize_keyboard=True,
-        one_time_keyboard=True,
-    )
-    await update.message.reply_text("Admin panel:", reply_markup=reply_markup)
+    await update.message.reply_text("Admin panel:", reply_markup=_ADMIN_MENU_KB)
     return ADMIN_MENU
 
 
@@ -71,19 +97,51 @@ async def addadmin_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         await update.message.reply_text("Usage: /addadmin <telegram_id>")
         return
     new_admin_id = int(context.args[0])
-    await asyncio.to_thread(add_admin, new_admin_id)
+    await run_db(add_admin, new_admin_id)
+    _ADMIN_IDS.add(new_admin_id)
     await update.message.reply_text(f"Added admin: {new_admin_id}")
 
 
+# Strong references to in-flight broadcast tasks so they aren't GC'd.
+_BROADCAST_TASKS: set[asyncio.Task] = set()
+
+
+async def _broadcast(bot, youtube_link: str) -> None:
+    # One kwargs dict shared across every send; parse_mode=None skips PTB's
+    # entity-parsing path and the silent notification goes easier on
+    # Telegram's rate limiter for mass sends.
+    send_kwargs = {
+        "text": f"New video just released!\n{youtube_link}",
+        "parse_mode": None,
+        "disable_notification": True,
+    }
+
+    async def _send_one(user_telegram_id: int) -> None:
+        try:
+            await bot.send_message(chat_id=user_telegram_id, **send_kwargs)
+        except Exception as e:
+            logger.warning(f"Failed to send to {user_telegram_id}: {e}")
+
+    # Stream users batch-by-batch instead of materializing the whole table:
+    # the first messages go out while later rows are still being fetched.
+    batches = iter_user_batches(BROADCAST_CHUNK_SIZE)
+    while True:
+        batch = await run_db(next, batches, None)
+        if batch is None:
+            break
+        await asyncio.gather(*(_send_one(user[3]) for user in batch), return_exceptions=True)
+        await asyncio.sleep(1.0)
+
+
 # ---- Add video flow ----
 async def add_video_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.message is None or update.effective_user is None:
         return ConversationHandler.END
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.message.reply_text("Access denied.")
         return ConversationHandler.END
 
-    await update.message.reply_text("Enter video title:", reply_markup=ReplyKeyboardRemove())
+    await update.message.reply_text("Enter video title:", reply_markup=_REMOVE_KB)
     return ADD_TITLE
 
 
@@ -102,7 +160,7 @@ async def add_video_title(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def add_video_link(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.message is None or update.message.text is None or update.effective_user is None:
         return ADD_LINK
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.message.reply_text("Access denied.")
         return ConversationHandler.END
 
@@ -113,114 +171,163 @@ async def add_video_link(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if not youtube_link:
         return ADD_LINK
 
-    await asyncio.to_thread(create_video, title, youtube_link)
+    await run_db(create_video, title, youtube_link)
+    invalidate_video_cache()
     context.user_data.pop("video_title", None)
 
     await update.message.reply_text("Video added successfully.")
 
-    # Broadcast
-    users = await asyncio.to_thread(get_all_users)
-    broadcast_message = f"New video just released!\n{youtube_link}"
-
-    for user in users:
-        user_telegram_id = user[3]
-        try:
-            await context.bot.send_message(chat_id=user_telegram_id, text=broadcast_message)
-        except Exception as e:
-            logger.warning(f"Failed to send to {user_telegram_id}: {e}")
-        await asyncio.sleep(0.05)
+    # Broadcast in the background — the admin shouldn't wait on the fanout.
+    task = asyncio.create_task(_broadcast(context.bot, youtube_link))
+    _BROADCAST_TASKS.add(task)
+    task.add_done_callback(_BROADCAST_TASKS.discard)
 
     # Back to admin menu
-    reply_markup = ReplyKeyboardMarkup(
-        [["Add Video", "View Users"], ["Manage Videos"]],
-        resize_keyboard=True,
-        one_time_keyboard=True,
-    )
-    await update.message.reply_text("Admin panel:", reply_markup=reply_markup)
+    await update.message.reply_text("Admin panel:", reply_markup=_ADMIN_MENU_KB)
     return ADMIN_MENU
 
 
 # ---- View users ----
+PAGE_SIZE = 10
+
+
+def _build_users_page(users: list, page: int) -> InlineKeyboardMarkup:
+    total_pages = max(1, -(-len(users) // PAGE_SIZE))
+    page = min(page, total_pages - 1)
+    start = page * PAGE_SIZE
+    rows = [
+        [InlineKeyboardButton(f"{name} ❌", callback_data=f"delete_user_{telegram_id}")]
+        for _, name, _, telegram_id in users[start : start + PAGE_SIZE]
+    ]
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton("⬅️", callback_data=f"users_page_{page - 1}"))
+    # The label is inert — re-rendering the same page would make Telegram
+    # reject the edit with "message is not modified".
+    nav.append(InlineKeyboardButton(f"Page {page + 1}/{total_pages}", callback_data="noop"))
+    if page < total_pages - 1:
+        nav.append(InlineKeyboardButton("➡️", callback_data=f"users_page_{page + 1}"))
+    rows.append(nav)
+    return InlineKeyboardMarkup(rows)
+
+
 async def view_users(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.effective_user is None or update.message is None:
         return ADMIN_MENU
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.message.reply_text("Access denied.")
         return ADMIN_MENU
 
-    users = await asyncio.to_thread(get_all_users)
+    users = await run_db(get_all_users)
     if not users:
         await update.message.reply_text("No registered users.")
         return ADMIN_MENU
 
-    for user in users:
-        _, name, phone, telegram_id = user
-        text = f"Name: {name}\nPhone: {phone}\nTelegram ID: {telegram_id}"
-        reply_markup = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("❌ Delete", callback_data=f"delete_user_{telegram_id}")]]
-        )
-        await update.message.reply_text(text, reply_markup=reply_markup)
-
+    # One message with a paginated keyboard instead of one message per
+    # user — a long list is otherwise N serial Telegram round-trips.
+    await update.message.reply_text("Users:", reply_markup=_build_users_page(users, 0))
     return ADMIN_MENU
 
 
-async def handle_delete_user_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def handle_users_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if update.effective_user is None or update.callback_query is None:
         return
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.callback_query.answer("Access denied.", show_alert=True)
         return
-    data = update.callback_query.data or ""
-    if not data.startswith("delete_user_"):
+    # Answer first so the button stops spinning even if the edit fails.
+    await update.callback_query.answer()
+    page = int(update.callback_query.data[_USERS_PAGE_PREFIX_LEN:])
+    users = await run_db(get_all_users)
+    if users:
+        await update.callback_query.edit_message_reply_markup(_build_users_page(users, page))
+    else:
+        await update.callback_query.edit_message_text("No registered users.")
+
+
+async def handle_delete_user_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user is None or update.callback_query is None:
         return
-    telegram_id_text = data.replace("delete_user_", "", 1)
-    if not telegram_id_text.isdigit():
+    if not _is_admin(update.effective_user.id):
+        await update.callback_query.answer("Access denied.", show_alert=True)
         return
-    await asyncio.to_thread(delete_user_by_telegram_id, int(telegram_id_text))
+    # The handler pattern already validated "delete_user_<digits>"; just
+    # slice the id off the fixed-length prefix.
+    telegram_id = int(update.callback_query.data[_DELETE_USER_PREFIX_LEN:])
+    await run_db(delete_user_by_telegram_id, telegram_id)
+    forget_known_user(telegram_id)
     await update.callback_query.edit_message_text("User deleted successfully.")
     await update.callback_query.answer()
 
 
 # ---- Manage videos ----
+def _build_videos_page(videos: list, page: int) -> InlineKeyboardMarkup:
+    total_pages = max(1, -(-len(videos) // PAGE_SIZE))
+    page = min(page, total_pages - 1)
+    start = page * PAGE_SIZE
+    rows = [
+        [InlineKeyboardButton(f"{title} ❌", callback_data=f"delete_video_{video_id}")]
+        for video_id, title, _ in videos[start : start + PAGE_SIZE]
+    ]
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton("⬅️", callback_data=f"videos_page_{page - 1}"))
+    nav.append(InlineKeyboardButton(f"Page {page + 1}/{total_pages}", callback_data="noop"))
+    if page < total_pages - 1:
+        nav.append(InlineKeyboardButton("➡️", callback_data=f"videos_page_{page + 1}"))
+    rows.append(nav)
+    return InlineKeyboardMarkup(rows)
+
+
 async def manage_videos(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.effective_user is None or update.message is None:
         return ADMIN_MENU
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.message.reply_text("Access denied.")
         return ADMIN_MENU
 
-    videos = await asyncio.to_thread(get_all_videos_with_id)
+    videos = await run_db(get_all_videos_with_id)
     if not videos:
         await update.message.reply_text("No videos available.")
         return ADMIN_MENU
 
-    for video_id, title, youtube_link in videos:
-        text = f"Title: {title}\nLink: {youtube_link}"
-        reply_markup = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("❌ Delete Video", callback_data=f"delete_video_{video_id}")]]
-        )
-        await update.message.reply_text(text, reply_markup=reply_markup)
-
+    await update.message.reply_text("Videos:", reply_markup=_build_videos_page(videos, 0))
     return ADMIN_MENU
 
 
-async def handle_delete_video_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def handle_videos_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if update.effective_user is None or update.callback_query is None:
         return
-    if not await _is_admin(update.effective_user.id):
+    if not _is_admin(update.effective_user.id):
         await update.callback_query.answer("Access denied.", show_alert=True)
         return
-    data = update.callback_query.data or ""
-    if not data.startswith("delete_video_"):
+    await update.callback_query.answer()
+    page = int(update.callback_query.data[_VIDEOS_PAGE_PREFIX_LEN:])
+    videos = await run_db(get_all_videos_with_id)
+    if videos:
+        await update.callback_query.edit_message_reply_markup(_build_videos_page(videos, page))
+    else:
+        await update.callback_query.edit_message_text("No videos available.")
+
+
+async def handle_delete_video_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user is None or update.callback_query is None:
         return
-    video_id_text = data.replace("delete_video_", "", 1)
-    if not video_id_text.isdigit():
+    if not _is_admin(update.effective_user.id):
+        await update.callback_query.answer("Access denied.", show_alert=True)
         return
-    await asyncio.to_thread(delete_video_by_id, int(video_id_text))
+    video_id = int(update.callback_query.data[_DELETE_VIDEO_PREFIX_LEN:])
+    await run_db(delete_video_by_id, video_id)
+    invalidate_video_cache()
     await update.callback_query.edit_message_text("Video deleted successfully.")
     await update.callback_query.answer()
 
 
+async def handle_noop_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.callback_query is not None:
+        await update.callback_query.answer()
+
+
 async def admin_menu_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.message is None:
         return ADMIN_MENU
@@ -238,7 +345,7 @@ async def admin_menu_router(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def admin_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.message is not None:
-        await update.message.reply_text("Closed admin panel.", reply_markup=ReplyKeyboardRemove())
+        await update.message.reply_text("Closed admin panel.", reply_markup=_REMOVE_KB)
     return ConversationHandler.END
 
 
@@ -258,8 +365,18 @@ admin_conversation = ConversationHandler(
 addadmin_handler = CommandHandler("addadmin", addadmin_command)
 
 admin_delete_user_callback_handler = CallbackQueryHandler(
-    handle_delete_user_callback, pattern=r"^delete_user_\d+$", block=True
+    handle_delete_user_callback, pattern=r"^delete_user_\d+$", block=False
 )
 admin_delete_video_callback_handler = CallbackQueryHandler(
-    handle_delete_video_callback, pattern=r"^delete_video_\d+$", block=True
+    handle_delete_video_callback, pattern=r"^delete_video_\d+$", block=False
+)
+
+admin_users_page_callback_handler = CallbackQueryHandler(
+    handle_users_page_callback, pattern=r"^users_page_\d+$", block=False
+)
+admin_videos_page_callback_handler = CallbackQueryHandler(
+    handle_videos_page_callback, pattern=r"^videos_page_\d+$", block=False
+)
+admin_noop_callback_handler = CallbackQueryHandler(
+    handle_noop_callback, pattern=r"^noop$", block=False
 )
\ No newline at end of file
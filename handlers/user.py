@@ -1,6 +1,15 @@
 import asyncio
-import re
-from telegram import KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, Update
+import functools
+import logging
+import time
+
+from telegram import (
+    KeyboardButton,
+    LinkPreviewOptions,
+    ReplyKeyboardMarkup,
+    ReplyKeyboardRemove,
+    Update,
+)
 from telegram.ext import (
     CommandHandler,
     ContextTypes,
@@ -11,35 +20,91 @@ from telegram.ext import (
 
 from database import (
     create_user,
+    get_all_user_ids,
     get_all_videos,
     get_user_by_telegram_id,
-    get_video_by_title,
+    run_db,
 )
 
+logger = logging.getLogger(__name__)
+
 # States
 NAME, PHONE, MENU = range(3)
 
-ADMIN_BUTTONS = {"Add Video", "View Users", "Manage Videos"}
-
-
-def _normalize_phone(text: str) -> str:
-    t = text.strip()
-    t = re.sub(r"[^\d+]", "", t)
-    return t
-
-
-def _build_videos_keyboard(titles: list[str]) -> ReplyKeyboardMarkup:
-    rows: list[list[str]] = []
-    row: list[str] = []
-    for title in titles:
-        row.append(title)
-        if len(row) == 2:
-            rows.append(row)
-            row = []
-    if row:
-        rows.append(row)
-
-    rows.append(["🔄 Refresh videos"])
+ADMIN_BUTTONS = frozenset({"Add Video", "View Users", "Manage Videos"})
+
+# Immutable, reused on every cancel / empty-catalog reply.
+_REMOVE_KB = ReplyKeyboardRemove()
+
+# Telegram expands link previews server-side before answering the send;
+# the video reply doesn't need one.
+_NO_PREVIEW = LinkPreviewOptions(is_disabled=True)
+
+# Registration is permanent, so known user ids can live in memory: loaded
+# once at startup via reload_known_users(), extended as users register.
+# A returning /start then never touches the database.
+_KNOWN_USERS: set[int] = set()
+
+
+def reload_known_users() -> None:
+    _KNOWN_USERS.clear()
+    _KNOWN_USERS.update(get_all_user_ids())
+
+
+def forget_known_user(telegram_id: int) -> None:
+    _KNOWN_USERS.discard(telegram_id)
+
+
+async def warmup_caches() -> None:
+    """Prime the video cache (and the DB pool behind it) at startup so the
+    first real user doesn't pay the cold-start query."""
+    await _cached_videos()
+
+# The video catalog changes rarely but is read on every menu interaction,
+# so keep it (plus a title -> prebuilt reply map) in memory behind a short
+# TTL.
+# Admin handlers call invalidate_video_cache() after add/delete so changes
+# show up immediately.
+_VIDEO_CACHE: dict = {
+    "at": 0.0,
+    "videos": [],
+    "reply_by_title": {},
+    "max_title_len": 0,
+}
+_VIDEO_TTL = 5.0
+_refresh_lock = asyncio.Lock()
+
+
+async def _cached_videos() -> list:
+    if time.monotonic() - _VIDEO_CACHE["at"] > _VIDEO_TTL:
+        # Single-flight: concurrent expirations queue on the lock and the
+        # double-check lets all but the first reuse the fresh result.
+        async with _refresh_lock:
+            if time.monotonic() - _VIDEO_CACHE["at"] > _VIDEO_TTL:
+                videos = await run_db(get_all_videos)
+                _VIDEO_CACHE["videos"] = videos
+                _VIDEO_CACHE["reply_by_title"] = {
+                    video[1]: f"Here is your video:\n{video[2]}" for video in videos
+                }
+                _VIDEO_CACHE["max_title_len"] = max(
+                    (len(video[1]) for video in videos), default=0
+                )
+                _VIDEO_CACHE["at"] = time.monotonic()
+    return _VIDEO_CACHE["videos"]
+
+
+def invalidate_video_cache() -> None:
+    _VIDEO_CACHE["at"] = 0.0
+    _build_videos_keyboard.cache_clear()
+
+
+# Memoized on the title tuple: the same catalog produces the same markup
+# for every user, so build it once and reuse it until the cache is
+# invalidated.
+@functools.lru_cache(maxsize=8)
+def _build_videos_keyboard(titles: tuple[str, ...]) -> ReplyKeyboardMarkup:
+    rows = tuple(titles[i : i + 2] for i in range(0, len(titles), 2))
+    rows += (("🔄 Refresh videos",),)
     return ReplyKeyboardMarkup(rows, resize_keyboard=True)
 
 
@@ -47,15 +112,15 @@ async def _send_video_menu(update: Update, prompt_text: str) -> None:
     if update.message is None:
         return
 
-    videos = await asyncio.to_thread(get_all_videos)
+    videos = await _cached_videos()
     if not videos:
         await update.message.reply_text(
             "No videos available yet.",
-            reply_markup=ReplyKeyboardRemove(),
+            reply_markup=_REMOVE_KB,
         )
         return
 
-    titles = [video[1] for video in videos]
+    titles = tuple(video[1] for video in videos)
     await update.message.reply_text(prompt_text, reply_markup=_build_videos_keyboard(titles))
 
 
@@ -63,8 +128,14 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     if update.effective_user is None or update.message is None:
         return ConversationHandler.END
 
-    existing_user = await asyncio.to_thread(get_user_by_telegram_id, update.effective_user.id)
+    telegram_id = update.effective_user.id
+    if telegram_id in _KNOWN_USERS:
+        await _send_video_menu(update, "Welcome back! Choose a video below.")
+        return MENU
+
+    existing_user = await run_db(get_user_by_telegram_id, telegram_id)
     if existing_user:
+        _KNOWN_USERS.add(telegram_id)
         await _send_video_menu(update, "Welcome back! Choose a video below.")
         return MENU
 
@@ -104,24 +175,111 @@ async def handle_phone(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         await update.message.reply_text("Please enter your full name:")
         return NAME
 
-    phone = ""
+    # No pre-stripping: the digit pass below ignores whitespace anyway, and
+    # the "+" check skips leading blanks itself.
     if update.message.contact and update.message.contact.phone_number:
-        phone = update.message.contact.phone_number.strip()
+        raw = update.message.contact.phone_number
     else:
-        phone = _normalize_phone((update.message.text or "").strip())
+        raw = update.message.text or ""
 
-    digits_only = re.sub(r"\D", "", phone)
-    if len(digits_only) < 7:
+    # Single pass: collect digits once instead of two regex substitutions.
+    digits = [c for c in raw if c.isdigit()]
+    if len(digits) < 7:
         await update.message.reply_text("Please share a valid phone number using the button.")
         return PHONE
+    phone = ("+" if raw.lstrip().startswith("+") else "") + "".join(digits)
 
-    await asyncio.to_thread(create_user, update.effective_user.id, name, phone)
+    await run_db(create_user, update.effective_user.id, name, phone)
+    _KNOWN_USERS.add(update.effective_user.id)
     context.user_data.pop("full_name", None)
 
     await _send_video_menu(update, "Registration successful! Choose a video below.")
     return MENU
 
 
+# Per-user debounce for the refresh button so spamming it doesn't turn
+# into a burst of menu sends. Stale entries are pruned once the dict
+# grows past the threshold.
+_LAST_REFRESH: dict[int, float] = {}
+_REFRESH_DEBOUNCE = 1.0
+_REFRESH_PRUNE_SIZE = 1024
+_REFRESH_PRUNE_AGE = 60.0
+
+
+async def _handle_refresh(update: Update) -> None:
+    user_id = update.effective_user.id
+    now = time.monotonic()
+    if now - _LAST_REFRESH.get(user_id, 0.0) < _REFRESH_DEBOUNCE:
+        return
+    _LAST_REFRESH[user_id] = now
+    if len(_LAST_REFRESH) > _REFRESH_PRUNE_SIZE:
+        cutoff = now - _REFRESH_PRUNE_AGE
+        for stale_id in [u for u, t in _LAST_REFRESH.items() if t < cutoff]:
+            del _LAST_REFRESH[stale_id]
+    await _send_video_menu(update, "Updated list. Choose a video:")
+
+
+async def _ignore(update: Update) -> None:
+    return
+
+
+# Control buttons resolve with one dict lookup; the admin panel texts map
+# to a no-op so the user handler never reacts to them. Anything else
+# falls through to the title lookup.
+_MENU_DISPATCH = {
+    "🔄 Refresh videos": _handle_refresh,
+    **{button: _ignore for button in ADMIN_BUTTONS},
+}
+
+
+async def _handle_menu_text(update: Update, text: str) -> None:
+    handler = _MENU_DISPATCH.get(text)
+    if handler is not None:
+        await handler(update)
+        return
+
+    await _cached_videos()
+    # Anything longer than the longest title can't be a title — skip even
+    # the dict hash for long chatter.
+    if len(text) > _VIDEO_CACHE["max_title_len"]:
+        return
+    reply = _VIDEO_CACHE["reply_by_title"].get(text)
+    if reply is None:
+        return
+
+    await update.message.reply_text(reply, link_preview_options=_NO_PREVIEW)
+
+
+# Menu work runs on one worker task per user: replies within a chat stay
+# in order even with block=False, while different chats proceed in
+# parallel. Workers exit after a minute idle; the next message respawns
+# one. Everything here runs on the single event loop, so the dict
+# bookkeeping needs no locking.
+_MENU_QUEUES: dict[int, asyncio.Queue] = {}
+_MENU_WORKERS: dict[int, asyncio.Task] = {}
+_WORKER_IDLE_TIMEOUT = 60.0
+
+
+async def _menu_worker(user_id: int, queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            try:
+                update, text = await asyncio.wait_for(queue.get(), _WORKER_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    break
+                continue
+            try:
+                await _handle_menu_text(update, text)
+            except Exception:
+                logger.exception(f"Menu worker error for user {user_id}")
+            finally:
+                queue.task_done()
+    finally:
+        _MENU_QUEUES.pop(user_id, None)
+        _MENU_WORKERS.pop(user_id, None)
+
+
 async def handle_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.effective_user is None or update.message is None:
         return MENU
@@ -130,39 +288,35 @@ async def handle_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     if not text:
         return MENU
 
-    # Ignore admin panel button texts completely
-    if text in ADMIN_BUTTONS:
-        return MENU
-
-    if text == "🔄 Refresh videos":
-        await _send_video_menu(update, "Updated list. Choose a video:")
-        return MENU
-
-    video = await asyncio.to_thread(get_video_by_title, text)
-    if not video:
-        return MENU
-
-    await update.message.reply_text(f"Here is your video:\n{video[2]}")
+    user_id = update.effective_user.id
+    queue = _MENU_QUEUES.get(user_id)
+    if queue is None:
+        queue = asyncio.Queue()
+        _MENU_QUEUES[user_id] = queue
+        _MENU_WORKERS[user_id] = asyncio.create_task(_menu_worker(user_id, queue))
+    queue.put_nowait((update, text))
     return MENU
 
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if update.message is not None:
-        await update.message.reply_text("Cancelled.", reply_markup=ReplyKeyboardRemove())
+        await update.message.reply_text("Cancelled.", reply_markup=_REMOVE_KB)
     context.user_data.pop("full_name", None)
     return ConversationHandler.END
 
 
+# block=False lets PTB run handlers for different users concurrently: one
+# user's in-flight DB call no longer stalls everyone else's updates.
 registration_handler = ConversationHandler(
-    entry_points=[CommandHandler("start", start_command)],
+    entry_points=[CommandHandler("start", start_command, block=False)],
     states={
-        NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_name)],
+        NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_name, block=False)],
         PHONE: [
-            MessageHandler(filters.CONTACT, handle_phone),
-            MessageHandler(filters.TEXT & ~filters.COMMAND, handle_phone),
+            MessageHandler(filters.CONTACT, handle_phone, block=False),
+            MessageHandler(filters.TEXT & ~filters.COMMAND, handle_phone, block=False),
         ],
-        MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_menu)],
+        MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_menu, block=False)],
     },
-    fallbacks=[CommandHandler("cancel", cancel)],
-    block=True,
+    fallbacks=[CommandHandler("cancel", cancel, block=False)],
+    block=False,
 )
\ No newline at end of file
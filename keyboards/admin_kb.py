@@ -1,2 +0,0 @@
-def admin_main_keyboard():
-    return None
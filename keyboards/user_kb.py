@@ -1,2 +0,0 @@
-def user_main_keyboard():
-    return None